@@ -0,0 +1,139 @@
+"""Shared Gradio client helpers for the test_engines and test_synthesis scripts.
+
+The scripts are run directly (python tools/<script>.py), which puts this
+directory on sys.path so they can import this module by name.
+"""
+
+import argparse
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from gradio_client import Client
+from gradio_client.utils import Status
+
+# Default URL - can be overridden via --url or GRADIO_URL env var
+DEFAULT_URL = os.getenv("GRADIO_URL", "http://127.0.0.1:7860/")
+
+# Endpoint api_name -> fn_index maps keyed by server URL
+_FN_INDICES = {}
+
+# Default cap on Clients that concurrent requests are spread across
+DEFAULT_POOL_SIZE = 8
+
+# Job states before the server starts running it; time spent in these does
+# not count against a call's timeout
+_WAITING_STATUSES = {Status.STARTING, Status.JOINING_QUEUE, Status.IN_QUEUE}
+
+# Seconds between status checks while a job waits in the server queue
+QUEUE_POLL_INTERVAL = 0.1
+
+# Rule printed above and below section headers
+_HEADER_LINE = "=" * 50
+
+
+def print_header(text: str) -> None:
+    """Print a section header."""
+    print(f"\n{_HEADER_LINE}\n {text}\n{_HEADER_LINE}")
+
+
+def parse_positive_int(value: str) -> int:
+    """argparse type for a count that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return number
+
+
+def parse_concurrency(value: str):
+    """argparse type for --concurrency: a positive int or "auto"."""
+    if value == "auto":
+        return value
+    try:
+        return parse_positive_int(value)
+    except argparse.ArgumentTypeError:
+        raise argparse.ArgumentTypeError("must be a positive integer or 'auto'") from None
+
+
+class ClientPool:
+    """Hands out Clients for one server, connecting extra ones only on demand.
+
+    Each Client has its own session and event stream, so spreading
+    concurrent requests across several keeps them from queuing behind a
+    single connection. A new Client is connected only when every existing
+    one is busy, so the pool never holds more Clients than requests were
+    in flight at once, nor more than max_size.
+    """
+
+    def __init__(self, client: Client, max_size: int = DEFAULT_POOL_SIZE):
+        self._src = client.src
+        self._idle = [client]
+        self._size = 1
+        self._max_size = max_size
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def client(self):
+        """Borrow a Client for the duration of the with-block."""
+        client = self._acquire()
+        try:
+            yield client
+        finally:
+            with self._cond:
+                self._idle.append(client)
+                self._cond.notify()
+
+    def _acquire(self) -> Client:
+        with self._cond:
+            while not self._idle and self._size >= self._max_size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+
+        # Connect outside the lock so busy workers can connect in parallel
+        try:
+            return Client(self._src, verbose=False)
+        except Exception:
+            with self._cond:
+                # Stop growing and share the Clients that did connect
+                self._size -= 1
+                self._max_size = self._size
+            return self._acquire()
+
+
+def wait_until_running(job) -> None:
+    """Block until job leaves the server queue (or has already finished).
+
+    Events without a concurrency_limit run one at a time on the server, so
+    concurrently submitted jobs can wait there well past a per-call timeout.
+    Call this before job.result(timeout=...) to time only the run itself.
+    """
+    while not job.done() and job.status().code in _WAITING_STATUSES:
+        time.sleep(QUEUE_POLL_INTERVAL)
+
+
+def endpoint_ref(client: Client, api_name: str) -> dict:
+    """Return the submit() keyword that addresses api_name on client's server.
+
+    api_name is resolved to its fn_index once per server, so later calls
+    skip gradio_client's name lookup. Falls back to api_name when the index
+    is unknown, e.g. on gradio_client versions whose endpoints lack fn_index.
+    """
+    fn_indices = _FN_INDICES.get(client.src)
+    if fn_indices is None:
+        endpoints = getattr(client, "endpoints", ())
+        if isinstance(endpoints, dict):
+            endpoints = endpoints.values()
+        fn_indices = _FN_INDICES[client.src] = {
+            endpoint.api_name: endpoint.fn_index
+            for endpoint in endpoints
+            if getattr(endpoint, "api_name", None) and hasattr(endpoint, "fn_index")
+        }
+    if api_name in fn_indices:
+        return {"fn_index": fn_indices[api_name]}
+    return {"api_name": api_name}
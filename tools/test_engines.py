@@ -5,15 +5,34 @@ This script runs inside the Pinokio conda environment and tests
 each TTS engine by loading it and optionally running synthesis.
 
 Usage:
-    python tools/test_engines.py [--url URL]
+    python tools/test_engines.py [--url URL] [--legacy] [--pool-size N] [--timeout SECONDS]
+                                 [--concurrency N|auto] [--concurrency-auto-tune]
 
 Options:
-    --url URL   Gradio server URL (default: http://127.0.0.1:7860/)
+    --url URL       Gradio server URL (default: http://127.0.0.1:7860/)
+    --legacy        Load engines one request at a time instead of using the
+                    batch /handle_load_all endpoint (for older servers)
+    --pool-size N   Max Clients to spread concurrent loads across; extra
+                    Clients connect only when needed (default: 8)
+    --timeout SECONDS
+                    Per-engine load timeout, counted from when the server
+                    starts the load rather than while it is queued (default: 120)
+    --concurrency N|auto
+                    Max engines loaded at once when loading individually.
+                    "auto" loads one engine first, then scales up by how many
+                    loads of that length fit in the timeout (default: auto)
+    --concurrency-auto-tune
+                    Halve concurrency after consecutive load timeouts
 """
 
 import argparse
-import os
+import re
 import sys
+import threading
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 try:
     from gradio_client import Client
@@ -21,9 +40,30 @@ except ImportError:
     print("ERROR: gradio_client required. Install with: pip install gradio_client")
     sys.exit(1)
 
-# Default URL - can be overridden via --url or GRADIO_URL env var
-DEFAULT_URL = os.getenv("GRADIO_URL", "http://127.0.0.1:7860/")
-
+from gradio_test_utils import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_URL,
+    ClientPool,
+    endpoint_ref,
+    parse_concurrency,
+    parse_positive_int,
+    print_header,
+    wait_until_running,
+)
+
+# Seconds a single engine load may run on the server before giving up on it
+LOAD_TIMEOUT = 120
+
+# Load status patterns, checked in priority order by _classify
+_READY_RE = re.compile(r"✅|loaded|ready", re.IGNORECASE)
+_DOWNLOAD_RE = re.compile(r"download", re.IGNORECASE)
+
+# Summary listings: (title, icon, status_tag), printed in this order
+SUMMARY_SECTIONS = [
+    ("Engines ready for use", "✓", True),
+    ("Engines needing model download", "⚠", "download"),
+    ("Failed engines", "❌", False),
+]
 
 # Engine definitions: (id, display_name, load_endpoint, load_args)
 # load_args: None for no params, dict for named params, or "skip" to skip loading
@@ -42,18 +82,137 @@ ENGINES = [
     ("vibevoice", "VibeVoice", "handle_vibevoice_load", "skip"),
 ]
 
+NAME_BY_ID = {engine_id: name for engine_id, name, _, _ in ENGINES}
+
+
+class _ConcurrencyGate:
+    """Bounds how many loads run at once; the bound can change mid-run."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def set_limit(self, limit: int) -> None:
+        with self._cond:
+            self.limit = max(1, limit)
+            self._cond.notify_all()
+
+    def __enter__(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+
+def _classify(status: str) -> tuple:
+    """Map a load status string to (status_tag, message)."""
+    if _READY_RE.search(status):
+        return True, "✓ Loaded"
+    elif _DOWNLOAD_RE.search(status):
+        return "download", "⚠ Needs download"
+    else:
+        # Extract error message
+        error = status.replace("❌", "").strip()[:40]
+        return False, f"❌ {error or 'Failed'}"
+
+
+def _load_one(client: Client, spec: tuple, timeout: float = LOAD_TIMEOUT) -> tuple:
+    """Load a single engine and classify the result.
+
+    Returns (engine_id, status_tag, message) where status_tag is True,
+    "download" or False. A load still running timeout seconds after the
+    server started it is cancelled and reported as failed.
+    """
+    engine_id, name, load_endpoint, load_args = spec
+    try:
+        job = client.submit(**(load_args or {}), **endpoint_ref(client, f"/{load_endpoint}"))
+        wait_until_running(job)
+        try:
+            result = job.result(timeout=timeout)
+        except FutureTimeoutError:
+            job.cancel()
+            return engine_id, False, f"❌ timeout after {timeout:g}s"
+
+        status = str(result[0]) if result else ""
+        return (engine_id, *_classify(status))
+
+    except Exception as e:
+        return engine_id, False, f"❌ {str(e)[:40]}"
+
 
-def print_header(text: str) -> None:
-    """Print a section header."""
-    print(f"\n{'=' * 50}")
-    print(f" {text}")
-    print('=' * 50)
+def _gated_load(gate: _ConcurrencyGate, pool: ClientPool, spec: tuple, timeout: float) -> tuple:
+    """Run _load_one once gate admits it; returns (result, elapsed_seconds)."""
+    with gate, pool.client() as client:
+        start = time.monotonic()
+        result = _load_one(client, spec, timeout)
+        return result, time.monotonic() - start
+
+
+def _load_all(client: Client, specs: list, timeout: float = LOAD_TIMEOUT) -> Optional[list]:
+    """Load every engine in specs with a single call to /handle_load_all.
+
+    The endpoint takes a list of engine ids and returns (engine_id, status)
+    pairs. Returns a list of (engine_id, status_tag, message) in the order
+    of specs, or None if the server does not expose the endpoint. Any other
+    failure, including a malformed response, is raised. The batch gets
+    timeout seconds per engine once the server starts it.
+    """
+    engine_ids = [engine_id for engine_id, _, _, _ in specs]
+    try:
+        job = client.submit(engine_ids, **endpoint_ref(client, "/handle_load_all"))
+    except ValueError:
+        # gradio_client's "Cannot find a function with api_name" error
+        return None
+    wait_until_running(job)
+    try:
+        statuses = dict(job.result(timeout=timeout * len(engine_ids)))
+    except FutureTimeoutError:
+        job.cancel()
+        raise
+    return [
+        (engine_id, *_classify(str(statuses[engine_id])))
+        if engine_id in statuses
+        else (engine_id, False, "❌ No status returned")
+        for engine_id in engine_ids
+    ]
 
 
 def main():
     """Test all TTS engines."""
     parser = argparse.ArgumentParser(description="Test TTS engines")
     parser.add_argument("--url", type=str, default=DEFAULT_URL, help="Gradio server URL")
+    parser.add_argument(
+        "--legacy", action="store_true", help="Load engines individually (older servers)"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=parse_positive_int,
+        default=DEFAULT_POOL_SIZE,
+        help="Max Clients for concurrent loads",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=LOAD_TIMEOUT,
+        help="Per-engine load timeout in seconds, not counting time queued on the server",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=parse_concurrency,
+        default="auto",
+        help="Max engines loaded at once, or 'auto'",
+    )
+    parser.add_argument(
+        "--concurrency-auto-tune",
+        action="store_true",
+        help="Halve concurrency after consecutive load timeouts",
+    )
     args = parser.parse_args()
 
     url = args.url.rstrip("/") + "/"
@@ -70,51 +229,96 @@ def main():
         print(f"ERROR: Failed to connect: {e}")
         return 1
 
-    # Test each engine
     print_header("Loading TTS Models")
 
-    results = {}
-    for engine_id, name, load_endpoint, load_args in ENGINES:
-        print(f"  {name}...", end=" ", flush=True)
-
+    outcomes = {}
+    to_load = []
+    for spec in ENGINES:
+        engine_id, name, _, load_args = spec
         # Skip engines that require complex setup
         if load_args == "skip":
-            print("⏭ Skipped (requires setup)")
-            results[engine_id] = "skip"
-            continue
-
+            print(f"  {name}... ⏭ Skipped (requires setup)")
+            outcomes[engine_id] = "skip"
+        else:
+            to_load.append(spec)
+
+    # Prefer one batched request, which saves a queue round trip per engine
+    batched = False
+    if to_load and not args.legacy:
         try:
-            if load_args is None:
-                result = client.predict(api_name=f"/{load_endpoint}")
+            batch_results = _load_all(client, to_load, args.timeout)
+            if batch_results is None:
+                print("  (batch endpoint unavailable, loading engines individually)")
             else:
-                result = client.predict(**load_args, api_name=f"/{load_endpoint}")
-
-            status = str(result[0]) if result else ""
-
-            if "✅" in status or "Loaded" in status.lower() or "ready" in status.lower():
-                print("✓ Loaded")
-                results[engine_id] = True
-            elif "download" in status.lower():
-                print("⚠ Needs download")
-                results[engine_id] = "download"
-            else:
-                # Extract error message
-                error = status.replace("❌", "").strip()[:40]
-                print(f"❌ {error or 'Failed'}")
-                results[engine_id] = False
-
+                for engine_id, status_tag, message in batch_results:
+                    outcomes[engine_id] = status_tag
+                    print(f"  {NAME_BY_ID[engine_id]}... {message}")
+                batched = True
         except Exception as e:
-            print(f"❌ {str(e)[:40]}")
-            results[engine_id] = False
+            # A batch timeout carries no message, so fall back to the type name
+            error = str(e)[:40] or type(e).__name__
+            for engine_id, _, _, _ in to_load:
+                outcomes[engine_id] = False
+                print(f"  {NAME_BY_ID[engine_id]}... ❌ {error}")
+            batched = True
+
+    # Otherwise load all engines concurrently; the server queues the requests
+    # and the client only waits on I/O, so wall time is bounded by the slowest engine
+    if to_load and not batched:
+        # Loads borrow Clients from a pool, which only grows to the number
+        # of loads the gate lets run at once
+        pool = ClientPool(client, args.pool_size)
+
+        # With "auto", load one engine first and size the concurrency by how
+        # many loads of that length fit in the per-engine timeout
+        auto = args.concurrency == "auto"
+        gate = _ConcurrencyGate(1 if auto else args.concurrency)
+        consecutive_timeouts = 0
+
+        with ThreadPoolExecutor(max_workers=len(to_load)) as executor:
+            futures = [
+                executor.submit(_gated_load, gate, pool, spec, args.timeout)
+                for spec in to_load
+            ]
+            for future in as_completed(futures):
+                (engine_id, status_tag, message), elapsed = future.result()
+                outcomes[engine_id] = status_tag
+                # Written from this thread only, so lines never interleave
+                sys.stdout.write(f"  {NAME_BY_ID[engine_id]}... {message}\n")
+
+                if auto:
+                    auto = False
+                    fits = int(args.timeout // max(elapsed, 1e-3))
+                    gate.set_limit(min(len(to_load), max(2, fits)))
+                    sys.stdout.write(f"  (concurrency set to {gate.limit})\n")
+
+                if args.concurrency_auto_tune:
+                    # elapsed includes time queued on the server, which the
+                    # timeout does not count, so check the reported outcome
+                    timed_out = message.startswith("❌ timeout")
+                    consecutive_timeouts = consecutive_timeouts + 1 if timed_out else 0
+                    if consecutive_timeouts >= 2 and gate.limit > 1:
+                        gate.set_limit(gate.limit // 2)
+                        consecutive_timeouts = 0
+                        sys.stdout.write(f"  (repeated timeouts, concurrency now {gate.limit})\n")
+
+    # One flush per section rather than per engine
+    sys.stdout.flush()
+
+    # Bucket engine ids by status in one pass, in table order regardless
+    # of completion order
+    buckets = {True: [], False: [], "download": [], "skip": []}
+    for engine_id, _, _, _ in ENGINES:
+        buckets[outcomes[engine_id]].append(engine_id)
 
     # Summary
     print_header("Summary")
 
-    loaded = sum(1 for v in results.values() if v is True)
-    needs_download = sum(1 for v in results.values() if v == "download")
-    skipped = sum(1 for v in results.values() if v == "skip")
-    failed = sum(1 for v in results.values() if v is False)
-    tested = len(results) - skipped
+    loaded = len(buckets[True])
+    needs_download = len(buckets["download"])
+    skipped = len(buckets["skip"])
+    failed = len(buckets[False])
+    tested = len(ENGINES) - skipped
 
     print(f"✓ Loaded:        {loaded}/{tested}")
     print(f"⚠ Needs download: {needs_download}/{tested}")
@@ -122,27 +326,10 @@ def main():
     if skipped > 0:
         print(f"⏭ Skipped:       {skipped}")
 
-    # Helper to get engine name
-    def get_name(eid):
-        return next(n for e, n, _, _ in ENGINES if e == eid)
-
-    if loaded > 0:
-        print("\nEngines ready for use:")
-        for engine_id, status in results.items():
-            if status is True:
-                print(f"  ✓ {get_name(engine_id)}")
-
-    if needs_download > 0:
-        print("\nEngines needing model download:")
-        for engine_id, status in results.items():
-            if status == "download":
-                print(f"  ⚠ {get_name(engine_id)}")
-
-    if failed > 0:
-        print("\nFailed engines:")
-        for engine_id, status in results.items():
-            if status is False:
-                print(f"  ❌ {get_name(engine_id)}")
+    for title, icon, status_tag in SUMMARY_SECTIONS:
+        if buckets[status_tag]:
+            listing = "\n".join(f"  {icon} {NAME_BY_ID[eid]}" for eid in buckets[status_tag])
+            print(f"\n{title}:\n{listing}")
 
     print("\nDone!")
     return 0 if loaded > 0 else 1
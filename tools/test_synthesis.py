@@ -9,11 +9,23 @@ all required values based on the API recorder format.
 
 Usage:
     python tools/test_synthesis.py [--url URL] [--engine ENGINE] [--output DIR]
+                                   [--all] [--concurrency N] [--pool-size N]
+                                   [--timeout SECONDS]
 
 Options:
     --url URL       Gradio server URL (default: http://127.0.0.1:7860/)
     --engine ENGINE TTS engine to test (default: KittenTTS)
     --output DIR    Output directory for audio files (default: /tmp/tts-test)
+    --all           Test all simple engines
+    --concurrency N Max phrases requested at once, 1 = serial (default: 1).
+                    Only faster if the server gives generate_unified_tts a
+                    concurrency_limit above 1; otherwise it runs them in turn
+    --pool-size N   Max Clients to spread concurrent requests across; extra
+                    Clients connect only when needed (default: 8)
+    --timeout SECONDS
+                    Per-phrase synthesis timeout, counted from when the
+                    server starts the request rather than while it is
+                    queued (default: 30)
 
 Note: The Gradio app also supports MCP server mode (53 tools).
 Enable with GRADIO_MCP_SERVER=true or launch(mcp_server=True).
@@ -23,7 +35,11 @@ import argparse
 import os
 import sys
 import shutil
-import wave
+import struct
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import ExitStack
+from typing import Callable, Optional
 
 try:
     from gradio_client import Client
@@ -31,8 +47,24 @@ except ImportError:
     print("ERROR: gradio_client required. Install with: pip install gradio_client")
     sys.exit(1)
 
-# Default URL - can be overridden via --url or GRADIO_URL env var
-DEFAULT_URL = os.getenv("GRADIO_URL", "http://127.0.0.1:7860/")
+from gradio_test_utils import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_URL,
+    ClientPool,
+    endpoint_ref,
+    parse_positive_int,
+    print_header,
+    wait_until_running,
+)
+
+# Unified TTS endpoint exercised by this script
+TTS_API_NAME = "/generate_unified_tts"
+
+# Unified TTS endpoint schemas keyed by server URL: (defaults, index, required)
+_TTS_SIGNATURES = {}
+
+# Seconds a single synthesis may run on the server before giving up on it
+SYNTHESIS_TIMEOUT = 30
 
 # Engines that work without reference audio
 SIMPLE_ENGINES = {
@@ -40,6 +72,26 @@ SIMPLE_ENGINES = {
     "Kokoro TTS": {"voice": "af_heart", "speed": 1.0},
 }
 
+# WAVE format tags accepted by validate_wav: PCM, IEEE float, extensible
+WAV_FORMAT_TAGS = {0x0001, 0x0003, 0xFFFE}
+
+# Maps characters that are unsafe in file names to replacements (or removal)
+_SAFE_TABLE = str.maketrans(
+    {
+        " ": "_",
+        ".": "",
+        "/": "_",
+        "\\": "_",
+        ":": "_",
+        "*": "",
+        "?": "",
+        '"': "",
+        "<": "",
+        ">": "",
+        "|": "",
+    }
+)
+
 # Test phrases
 TEST_PHRASES = [
     "Hello from PMOVES.",
@@ -47,11 +99,75 @@ TEST_PHRASES = [
 ]
 
 
-def print_header(text: str) -> None:
-    """Print a section header."""
-    print(f"\n{'=' * 50}")
-    print(f" {text}")
-    print("=" * 50)
+def get_tts_signature(client: Client) -> tuple:
+    """Return (defaults, index, required) for client's unified TTS endpoint.
+
+    defaults holds one value per endpoint parameter (None where the schema
+    has no default) and index maps parameter names to positions, so calls
+    can be made positionally instead of resolving keywords on every request.
+    required is the set of parameter names without a default, which every
+    call must set explicitly.
+    """
+    signature = _TTS_SIGNATURES.get(client.src)
+    if signature is None:
+        api = client.view_api(print_info=False, return_format="dict")
+        params = api["named_endpoints"][TTS_API_NAME]["parameters"]
+        defaults = tuple(
+            p.get("parameter_default") if p.get("parameter_has_default") else None
+            for p in params
+        )
+        index = {p["parameter_name"]: i for i, p in enumerate(params)}
+        required = frozenset(
+            p["parameter_name"] for p in params if not p.get("parameter_has_default")
+        )
+        signature = _TTS_SIGNATURES[client.src] = (defaults, index, required)
+    return signature
+
+
+def _read_wav_header(f) -> tuple:
+    """Read (format_tag, channels, sample_rate, block_align, data_size) from a WAV.
+
+    Only chunk headers are read; payloads of other chunks are skipped, so
+    this works for files with LIST/fact chunks or an extensible fmt chunk.
+    """
+    riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("missing data chunk")
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack("<HHIIH", f.read(14))
+            # Chunks are word aligned
+            f.seek(chunk_size - 14 + (chunk_size & 1), os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            format_tag, channels, sample_rate, _, block_align = fmt
+            return format_tag, channels, sample_rate, block_align, chunk_size
+        else:
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def _materialize(src: str, dst: str) -> None:
+    """Place src at dst, hardlinking when possible instead of copying."""
+    # Never write through an existing dst: it may be a hardlink from a
+    # previous run that shares its inode with a Gradio cache file
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Cross-device or unsupported filesystem; copyfile uses
+        # sendfile/fcopyfile where the platform provides them
+        shutil.copyfile(src, dst)
 
 
 def validate_wav(filepath: str) -> dict:
@@ -65,30 +181,40 @@ def validate_wav(filepath: str) -> dict:
         "errors": [],
     }
 
-    if not os.path.exists(filepath):
+    # One stat covers both the existence and size checks; like
+    # os.path.exists, any stat failure counts as a missing file
+    try:
+        st = os.stat(filepath)
+    except (OSError, ValueError):
         result["errors"].append("File does not exist")
         return result
 
-    result["size"] = os.path.getsize(filepath)
+    result["size"] = st.st_size
     if result["size"] < 100:
         result["errors"].append(f"File too small ({result['size']} bytes)")
         return result
 
     try:
-        with wave.open(filepath, "rb") as wf:
-            result["sample_rate"] = wf.getframerate()
-            result["channels"] = wf.getnchannels()
-            frames = wf.getnframes()
-            result["duration"] = frames / result["sample_rate"]
-
-            if result["duration"] < 0.1:
-                result["errors"].append(f"Duration too short ({result['duration']:.2f}s)")
-            elif result["sample_rate"] not in [16000, 22050, 24000, 44100, 48000]:
-                result["errors"].append(f"Unusual sample rate ({result['sample_rate']})")
-            else:
-                result["valid"] = True
+        with open(filepath, "rb") as f:
+            format_tag, channels, sample_rate, block_align, data_size = _read_wav_header(f)
+
+        if format_tag not in WAV_FORMAT_TAGS:
+            raise ValueError(f"unsupported format tag 0x{format_tag:04X}")
+        if not sample_rate or not block_align:
+            raise ValueError("zero sample rate or block align")
+
+        result["sample_rate"] = sample_rate
+        result["channels"] = channels
+        result["duration"] = data_size / block_align / sample_rate
+
+        if result["duration"] < 0.1:
+            result["errors"].append(f"Duration too short ({result['duration']:.2f}s)")
+        elif result["sample_rate"] not in [16000, 22050, 24000, 44100, 48000]:
+            result["errors"].append(f"Unusual sample rate ({result['sample_rate']})")
+        else:
+            result["valid"] = True
 
-    except wave.Error as e:
+    except (ValueError, struct.error) as e:
         result["errors"].append(f"Invalid WAV: {e}")
     except Exception as e:
         result["errors"].append(f"Error reading file: {e}")
@@ -96,20 +222,26 @@ def validate_wav(filepath: str) -> dict:
     return result
 
 
-def test_synthesis(
+def _request_audio(
     client: Client,
     engine: str,
     text: str,
-    output_dir: str,
     voice_params: dict,
-) -> bool:
-    """Test synthesis for a single engine/text combination."""
-    print(f"\n  Testing: {engine}")
-    print(f"  Text: {text[:50]}...")
+    log: Callable[[str], None] = print,
+    timeout: float = SYNTHESIS_TIMEOUT,
+) -> Optional[str]:
+    """Synthesize text with engine and return the audio path, or None on failure.
+
+    The request is cancelled if it is still running timeout seconds after
+    the server started it; time spent queued behind other requests is not
+    counted.
+    """
+    log(f"\n  Testing: {engine}")
+    log(f"  Text: {text[:50]}...")
 
     try:
-        # Use keyword arguments with only essential params
-        # Gradio will use defaults for all other 92 parameters
+        # Only essential params are set here; the other 92 parameters keep
+        # the defaults from the cached endpoint schema
         kwargs = {
             "text_input": text,
             "tts_engine": engine,
@@ -123,39 +255,163 @@ def test_synthesis(
             kwargs["kokoro_voice"] = voice_params.get("voice", "af_heart")
             kwargs["kokoro_speed"] = voice_params.get("speed", 1.0)
 
-        result = client.predict(**kwargs, api_name="/generate_unified_tts")
+        defaults, index, required = get_tts_signature(client)
+        missing = required.difference(kwargs)
+        if missing:
+            raise TypeError(f"No value provided for required argument(s): {sorted(missing)}")
+
+        args = list(defaults)
+        for name, value in kwargs.items():
+            args[index[name]] = value
+
+        job = client.submit(*args, **endpoint_ref(client, TTS_API_NAME))
+        wait_until_running(job)
+        try:
+            result = job.result(timeout=timeout)
+        except FutureTimeoutError:
+            job.cancel()
+            log(f"  ❌ Synthesis timed out after {timeout:g}s")
+            return None
 
         # Check result
         if not result:
-            print("  ❌ No result returned")
-            return False
+            log("  ❌ No result returned")
+            return None
 
         audio_path = result[0] if isinstance(result, tuple) else result
         if not audio_path:
-            print("  ❌ No audio path in result")
-            return False
+            log("  ❌ No audio path in result")
+            return None
 
-        # Validate the audio file
-        validation = validate_wav(audio_path)
+        return audio_path
 
-        if validation["valid"]:
-            # Copy to output directory
-            safe_name = text[:30].replace(" ", "_").replace(".", "") + ".wav"
-            output_path = os.path.join(output_dir, f"{engine.replace(' ', '_')}_{safe_name}")
-            shutil.copy(audio_path, output_path)
+    except Exception as e:
+        log(f"  ❌ Synthesis error: {str(e)[:60]}")
+        return None
 
-            print(f"  ✓ Generated: {validation['duration']:.2f}s @ {validation['sample_rate']}Hz")
-            print(f"  ✓ Saved to: {output_path}")
-            return True
-        else:
-            print(f"  ❌ Validation failed: {', '.join(validation['errors'])}")
+
+def _output_prefix(output_dir: str, engine: str) -> str:
+    """Return the absolute path prefix for engine's files in output_dir."""
+    return os.path.join(os.path.abspath(output_dir), engine.replace(" ", "_") + "_")
+
+
+def _post_process(
+    audio_path: str,
+    text: str,
+    output_prefix: str,
+    log: Callable[[str], None] = print,
+) -> bool:
+    """Validate synthesized audio and save it under output_prefix."""
+    try:
+        validation = validate_wav(audio_path)
+
+        if not validation["valid"]:
+            log(f"  ❌ Validation failed: {', '.join(validation['errors'])}")
             return False
 
+        # Link or copy to output directory
+        safe_name = text[:30].translate(_SAFE_TABLE) + ".wav"
+        output_path = output_prefix + safe_name
+        _materialize(audio_path, output_path)
+
+        log(f"  ✓ Generated: {validation['duration']:.2f}s @ {validation['sample_rate']}Hz")
+        log(f"  ✓ Saved to: {output_path}")
+        return True
+
     except Exception as e:
-        print(f"  ❌ Synthesis error: {str(e)[:60]}")
+        log(f"  ❌ Synthesis error: {str(e)[:60]}")
         return False
 
 
+def test_synthesis(
+    client: Client,
+    engine: str,
+    text: str,
+    output_dir: str,
+    voice_params: dict,
+    log: Callable[[str], None] = print,
+    timeout: float = SYNTHESIS_TIMEOUT,
+) -> bool:
+    """Test synthesis for a single engine/text combination.
+
+    This is the --concurrency 1 path; output is logged as it happens.
+    """
+    audio_path = _request_audio(client, engine, text, voice_params, log, timeout)
+    if audio_path is None:
+        return False
+    return _post_process(audio_path, text, _output_prefix(output_dir, engine), log)
+
+
+def _finish_buffered(
+    audio_path: Optional[str],
+    text: str,
+    output_prefix: str,
+    lines: list,
+) -> tuple:
+    """Post-process a buffered synthesis, returning (ok, lines)."""
+    if audio_path is None:
+        return False, lines
+    return _post_process(audio_path, text, output_prefix, lines.append), lines
+
+
+def _synthesize_buffered(
+    pool: ClientPool,
+    engine: str,
+    text: str,
+    output_prefix: str,
+    voice_params: dict,
+    timeout: float,
+    post_pool: Executor,
+) -> Future:
+    """Request audio, then hand validation and saving to post_pool.
+
+    Output is captured rather than printed, for in-order replay. Returns a
+    future for (ok, lines), so the calling worker is free to start the next
+    request while the file is validated.
+    """
+    lines = []
+    with pool.client() as client:
+        audio_path = _request_audio(client, engine, text, voice_params, lines.append, timeout)
+    return post_pool.submit(_finish_buffered, audio_path, text, output_prefix, lines)
+
+
+def _submit_all(
+    stack: ExitStack, client: Client, engines: list, output_dir: str, args: argparse.Namespace
+) -> dict:
+    """Submit every (engine, phrase) pair for concurrent synthesis.
+
+    The executors are entered on stack, which shuts them down on exit.
+    Returns {engine: [future, ...]} in TEST_PHRASES order, where each
+    future resolves to a future for (ok, lines).
+    """
+    # Workers borrow Clients from a pool, which grows to at most one per worker
+    pool = ClientPool(client, args.pool_size)
+
+    # Validation and saving run on a separate pool so synthesis workers move
+    # straight on to their next request
+    post_pool = stack.enter_context(ThreadPoolExecutor(max_workers=2))
+    executor = stack.enter_context(ThreadPoolExecutor(max_workers=args.concurrency))
+
+    futures = {}
+    for engine in engines:
+        # Output paths only depend on the engine, so build the prefix once
+        output_prefix = _output_prefix(output_dir, engine)
+        futures[engine] = [
+            executor.submit(
+                _synthesize_buffered,
+                pool,
+                engine,
+                text,
+                output_prefix,
+                SIMPLE_ENGINES[engine],
+                args.timeout,
+                post_pool,
+            )
+            for text in TEST_PHRASES
+        ]
+    return futures
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Test TTS audio synthesis")
@@ -163,6 +419,24 @@ def main():
     parser.add_argument("--engine", type=str, default="KittenTTS", help="TTS engine to test")
     parser.add_argument("--output", type=str, default="/tmp/tts-test", help="Output directory")
     parser.add_argument("--all", action="store_true", help="Test all simple engines")
+    parser.add_argument(
+        "--concurrency",
+        type=parse_positive_int,
+        default=1,
+        help="Max phrases requested at once (1 = serial); needs a server concurrency_limit > 1",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=parse_positive_int,
+        default=DEFAULT_POOL_SIZE,
+        help="Max Clients for concurrent requests",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=SYNTHESIS_TIMEOUT,
+        help="Per-phrase synthesis timeout in seconds, not counting time queued on the server",
+    )
     args = parser.parse_args()
 
     url = args.url.rstrip("/") + "/"
@@ -184,6 +458,13 @@ def main():
         print(f"ERROR: Failed to connect: {e}")
         return 1
 
+    # Read the unified TTS endpoint schema once, before any synthesis
+    try:
+        get_tts_signature(client)
+    except Exception as e:
+        print(f"ERROR: Could not read {TTS_API_NAME} schema: {e}")
+        return 1
+
     # Determine engines to test
     if args.all:
         engines_to_test = list(SIMPLE_ENGINES.keys())
@@ -194,20 +475,38 @@ def main():
             return 1
         engines_to_test = [args.engine]
 
-    # Test each engine
+    # Test each engine. With --concurrency above 1, every (engine, phrase)
+    # pair is submitted up front so the server always has queued work, and
+    # output is replayed in submission order
     results = {}
-    for engine in engines_to_test:
-        print_header(f"Testing {engine}")
-
-        voice_params = SIMPLE_ENGINES[engine]
-        success_count = 0
-
-        for text in TEST_PHRASES:
-            if test_synthesis(client, engine, text, output_dir, voice_params):
-                success_count += 1
-
-        results[engine] = success_count == len(TEST_PHRASES)
-        print(f"\n  Result: {success_count}/{len(TEST_PHRASES)} phrases succeeded")
+    with ExitStack() as stack:
+        futures = None
+        if args.concurrency > 1:
+            futures = _submit_all(stack, client, engines_to_test, output_dir, args)
+
+        for engine in engines_to_test:
+            print_header(f"Testing {engine}")
+
+            voice_params = SIMPLE_ENGINES[engine]
+            success_count = 0
+            if futures is None:
+                # Serial: request, validate and save each phrase in turn
+                for text in TEST_PHRASES:
+                    if test_synthesis(
+                        client, engine, text, output_dir, voice_params, timeout=args.timeout
+                    ):
+                        success_count += 1
+            else:
+                for future in futures[engine]:
+                    ok, lines = future.result().result()
+                    print("\n".join(lines))
+                    if ok:
+                        success_count += 1
+
+            results[engine] = success_count == len(TEST_PHRASES)
+            print(f"\n  Result: {success_count}/{len(TEST_PHRASES)} phrases succeeded")
+            # One flush per engine section rather than per phrase
+            sys.stdout.flush()
 
     # Summary
     print_header("Summary")